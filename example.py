@@ -5,7 +5,7 @@ from poloniex import poloniex
 
 
 def test_ticker():
-	api = poloniex.Poloniex('examples/config.py')
+	api = poloniex.Poloniex('examples/config.json')
 
 	while True:
 		print(api.ticker())
@@ -14,7 +14,7 @@ def test_ticker():
 
 
 def test_volume():
-	api = poloniex.Poloniex('examples/config.py')
+	api = poloniex.Poloniex('examples/config.json')
 
 	while True:
 		print(api.daily_volume())
@@ -23,7 +23,7 @@ def test_volume():
 
 
 def test_order_book():
-	api = poloniex.Poloniex('examples/config.py')
+	api = poloniex.Poloniex('examples/config.json')
 
 	while True:
 		print(api.order_book())
@@ -36,5 +36,7 @@ def test_ws(*args, **kwargs):
 
 
 if __name__ == '__main__':
-	api = poloniex.Poloniex('examples/config.py')
+	api = poloniex.Poloniex('examples/config.json')
 	api.attach_order_book(test_ws, 'BTC_ETH')
+	api.attach_ticker(test_ws)
+	api.run_forever()
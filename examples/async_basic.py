@@ -0,0 +1,24 @@
+import asyncio
+
+
+from poloniex.async_poloniex import AsyncPoloniex
+
+
+PAIRS = ['BTC_ETH', 'BTC_LTC', 'BTC_XMR']
+
+
+async def order_books(api):
+	# All the order books are fetched concurrently, so this takes roughly one round trip instead of len(PAIRS)
+	books = await asyncio.gather(*[api.order_book(pair) for pair in PAIRS])
+	for pair, book in zip(PAIRS, books):
+		print(pair, book)
+
+
+async def main():
+	async with AsyncPoloniex('examples/config.json') as api:
+		print(await api.ticker())
+		await order_books(api)
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
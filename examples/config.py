@@ -1,2 +0,0 @@
-api_key = 'py api key'
-secret = 'py secret'
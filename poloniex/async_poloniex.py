@@ -0,0 +1,162 @@
+import asyncio
+
+
+import aiohttp
+import orjson
+
+
+from poloniex.poloniex import (
+	Poloniex, CANDLE_PERIOD_14400, REQUEST_TIMEOUT, _PUBLIC_SPEC, _PRIVATE_SPEC, _chart_data_error,
+	_make_method, _select_pairs,
+)
+
+
+# Poloniex allows 6 calls per second, so there is no point in opening more connections than that to one host
+CONNECTION_LIMIT = 32
+CONNECTION_LIMIT_PER_HOST = 6
+DNS_CACHE_TTL = 300
+# Same connect and read timeouts as the blocking client, instead of aiohttp's five minute default
+CLIENT_TIMEOUT = aiohttp.ClientTimeout(sock_connect=REQUEST_TIMEOUT[0], sock_read=REQUEST_TIMEOUT[1])
+# Enough of the response to tell a list of candles from an error object
+PEEK_SIZE = 64
+
+
+class _PrefixedStream(object):
+	'''
+	Async file-like object returning bytes already read off a response before the rest of it, since aiohttp's
+	StreamReader cannot peek.
+	'''
+	def __init__(self, head, stream):
+		self.head = head
+		self.stream = stream
+
+	async def read(self, size=-1):
+		if not self.head:
+			return await self.stream.read(size)
+		if size < 0:
+			head, self.head = self.head, b''
+			return head + await self.stream.read()
+		data, self.head = self.head[:size], self.head[size:]
+		return data
+
+
+class AsyncPoloniex(Poloniex):
+	'''
+	Coroutine based variant of the client. Credentials, endpoints, signing and rate limiting are shared with Poloniex,
+	but all the REST methods are coroutines, so several of them can be awaited concurrently, e.g.
+	asyncio.gather(api.order_book('BTC_ETH'), api.order_book('BTC_LTC')). Private calls can be gathered too, but they
+	are sent one at a time, since the exchange rejects nonces that arrive out of order. Responses are not cached. Use
+	it with async with, not with.
+	'''
+	def __init__(self, config_file_path=None, api_key=None, secret=None):
+		super().__init__(config_file_path=config_file_path, api_key=api_key, secret=secret)
+
+		# Created on first use, so that it binds to the loop that actually runs the requests
+		self._session = None
+		# Held from signing until the response arrives, so private calls reach the exchange in nonce order
+		self._private_lock = asyncio.Lock()
+
+	def _get_session(self):
+		if self._session is None or self._session.closed:
+			connector = aiohttp.TCPConnector(
+				limit=CONNECTION_LIMIT,
+				limit_per_host=CONNECTION_LIMIT_PER_HOST,
+				ttl_dns_cache=DNS_CACHE_TTL
+			)
+			self._session = aiohttp.ClientSession(connector=connector, timeout=CLIENT_TIMEOUT)
+		return self._session
+
+	async def _wait_for_throttle(self):
+		# The bucket is shared with the blocking methods, but waiting here yields to the loop instead of sleeping
+		delay = self._throttle.reserve()
+		if delay > 0:
+			await asyncio.sleep(delay)
+
+	async def _public(self, params):
+		await self._wait_for_throttle()
+		async with self._get_session().get(self._public_url, params=params) as response:
+			return orjson.loads(await response.read())
+
+	async def _private(self, params):
+		async with self._private_lock:
+			await self._wait_for_throttle()
+			body, headers = self._sign_request_data(params)
+			async with self._get_session().post(self._private_url, data=body, headers=headers) as response:
+				return orjson.loads(await response.read())
+
+	async def close(self):
+		'''
+		Closes both the aiohttp session and the inherited requests session.
+		:return: None
+		'''
+		if self._session is not None:
+			await self._session.close()
+		super().close()
+
+	def __enter__(self):
+		raise TypeError('AsyncPoloniex has to be closed with await, use "async with" instead of "with"')
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		pass
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def tickers(self, pairs=None):
+		'''
+		Returns the ticker for the requested currency pairs out of one returnTicker call.
+		:param pairs: iterable of currency pairs, all of them if omitted
+		:return: ticker blob keyed by currency pair (dict)
+		'''
+		return _select_pairs(await self.ticker(), pairs)
+
+	async def order_books_all(self, depth=10, pairs=None):
+		'''
+		Returns the order books for the requested currency pairs out of one returnOrderBook call with currencyPair=all.
+		One call is cheaper than gathering order_book for every pair, as all of them count against the rate limit.
+		:param depth: depth of the order books
+		:param pairs: iterable of currency pairs, all of them if omitted
+		:return: order book blob keyed by currency pair (dict)
+		'''
+		return _select_pairs(await self.order_book('all', depth), pairs)
+
+	async def chart_data_field(self, pair, start, end, field='close', period=CANDLE_PERIOD_14400):
+		'''
+		Returns a single field of every candle, parsing the response as it streams in instead of building a dict per
+		candle. Like Poloniex.chart_data_field, this trades CPU for memory (about 3x the parse time of chart_data for
+		a fraction of its peak memory). Numbers come back as int/float, like chart_data. Requires ijson
+		(pip install poloniex[streaming]).
+		:param pair - currency pair for the chart data
+		:param start - Unix timestamp of the start of the interval
+		:param end - Unix timestamp of the end of the interval
+		:param field - candle field to return (date, high, low, open, close, volume, quoteVolume, weightedAverage)
+		:param period - period for the candle representation
+		:return: values of the field, in candle order (list)
+		'''
+		import ijson
+
+		params = {
+			'command': 'returnChartData',
+			'currencyPair': pair,
+			'start': start,
+			'end': end,
+			'period': period,
+		}
+
+		await self._wait_for_throttle()
+		async with self._get_session().get(self._public_url, params=params) as response:
+			head = await response.content.read(PEEK_SIZE)
+			if not head.lstrip().startswith(b'['):
+				raise _chart_data_error(head + await response.content.read())
+			stream = _PrefixedStream(head, response.content)
+			return [value async for value in ijson.items(stream, 'item.' + field, use_float=True)]
+
+
+for _name, (_command, _args, _ttl, _doc) in _PUBLIC_SPEC.items():
+	setattr(AsyncPoloniex, _name, _make_method(AsyncPoloniex, _name, _command, _args, _doc, '_public', coroutine=True))
+
+for _name, (_command, _args, _ttl, _doc) in _PRIVATE_SPEC.items():
+	setattr(AsyncPoloniex, _name, _make_method(AsyncPoloniex, _name, _command, _args, _doc, '_private', coroutine=True))
@@ -41,5 +41,10 @@ setup(
 
     packages=find_packages(exclude=['examples', 'tests']),
 
-    install_requires=['requests', 'autobahn[asyncio ]'],
+    install_requires=['requests', 'autobahn[asyncio ]', 'orjson'],
+
+    extras_require={
+        'async': ['aiohttp'],
+        'streaming': ['ijson'],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,131 @@
+import asyncio
+import importlib.util
+import io
+import unittest
+import urllib.parse
+
+
+if importlib.util.find_spec('aiohttp') is None:
+	raise unittest.SkipTest('aiohttp is an optional dependency')
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+
+from poloniex import poloniex
+from poloniex import async_poloniex
+
+
+class FakeResponse(object):
+	async def read(self):
+		return b'{}'
+
+
+class FakeRequest(object):
+	def __init__(self, session, body, delay):
+		self.session = session
+		self.body = body
+		self.delay = delay
+
+	async def __aenter__(self):
+		await asyncio.sleep(self.delay)
+		self.session.received.append(int(urllib.parse.parse_qs(self.body.decode())['nonce'][0]))
+		return FakeResponse()
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		pass
+
+
+class FakeSession(object):
+	'''
+	Stands in for aiohttp.ClientSession. Earlier requests take longer, so without serialization they would reach the
+	exchange in reverse order.
+	'''
+	def __init__(self):
+		self.received = []
+		self.delays = [0.03, 0.02, 0.01, 0]
+
+	def post(self, url, data=None, headers=None):
+		return FakeRequest(self, data, self.delays.pop(0))
+
+
+class FakeStreamReader(object):
+	def __init__(self, content):
+		self.buffer = io.BytesIO(content)
+
+	async def read(self, size=-1):
+		return self.buffer.read(size)
+
+
+class FakeStreamedResponse(object):
+	def __init__(self, content):
+		self.content = FakeStreamReader(content)
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		pass
+
+
+class FakeStreamingSession(object):
+	def __init__(self, content):
+		self.content = content
+
+	def get(self, url, params=None):
+		return FakeStreamedResponse(self.content)
+
+
+def make_client():
+	api = async_poloniex.AsyncPoloniex(api_key='key', secret='secret')
+	api._throttle = poloniex.TokenBucket(10 ** 6, 10 ** 6)
+	return api
+
+
+class AsyncPoloniexTest(unittest.TestCase):
+	def test_sync_context_manager_is_rejected(self):
+		with self.assertRaises(TypeError):
+			with make_client():
+				pass
+
+	def test_gathered_private_calls_arrive_in_nonce_order(self):
+		api = make_client()
+		session = FakeSession()
+		api._get_session = lambda: session
+
+		async def gather():
+			await asyncio.gather(*[api.balances() for _ in range(4)])
+
+		asyncio.run(gather())
+		self.assertEqual(session.received, sorted(session.received))
+		self.assertEqual(len(set(session.received)), 4)
+
+	def test_generated_methods_belong_to_the_async_client(self):
+		method = async_poloniex.AsyncPoloniex.buy
+		self.assertEqual((method.__module__, method.__qualname__), ('poloniex.async_poloniex', 'AsyncPoloniex.buy'))
+
+	def test_session_uses_request_timeout(self):
+		api = make_client()
+
+		async def timeout():
+			async with api:
+				return api._get_session().timeout
+
+		timeout = asyncio.run(timeout())
+		self.assertEqual((timeout.sock_connect, timeout.sock_read), poloniex.REQUEST_TIMEOUT)
+
+	@unittest.skipIf(ijson is None, 'ijson is an optional dependency')
+	def test_chart_data_field(self):
+		api = make_client()
+		api._get_session = lambda: FakeStreamingSession(b'[{"date": 1, "close": 0.5}, {"date": 2, "close": 0.75}]')
+		self.assertEqual(asyncio.run(api.chart_data_field('BTC_ETH', 1, 2)), [0.5, 0.75])
+
+		# Longer than the peeked head, so the rest comes from the stream
+		candles = b'[' + b', '.join(b'{"date": %d, "close": 0.5}' % date for date in range(100)) + b']'
+		api._get_session = lambda: FakeStreamingSession(candles)
+		self.assertEqual(asyncio.run(api.chart_data_field('BTC_ETH', 1, 2, field='date')), list(range(100)))
+
+		api._get_session = lambda: FakeStreamingSession(b'{"error": "Invalid currency pair."}')
+		with self.assertRaisesRegex(Exception, 'Invalid currency pair.'):
+			asyncio.run(api.chart_data_field('BTC_XXX', 1, 2))
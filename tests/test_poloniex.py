@@ -0,0 +1,450 @@
+import asyncio
+import datetime
+import decimal
+import hashlib
+import hmac
+import io
+import os
+import tempfile
+import threading
+import unittest
+import urllib.parse
+from unittest import mock
+
+
+import orjson
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+
+from poloniex import poloniex
+
+
+class FakeResponse(object):
+	def __init__(self, blob):
+		self.content = orjson.dumps(blob)
+
+
+class FakeSession(object):
+	'''
+	Stands in for requests.Session, recording what would have been sent.
+	'''
+	def __init__(self, blob=None):
+		self.blob = {} if blob is None else blob
+		self.calls = []
+
+	def get(self, url, params=None, timeout=None):
+		self.calls.append(('get', url, dict(params)))
+		return FakeResponse(self.blob)
+
+	def post(self, url, data=None, headers=None, timeout=None):
+		self.calls.append(('post', url, data, headers))
+		return FakeResponse(self.blob)
+
+	def close(self):
+		pass
+
+
+def make_client(blob=None):
+	api = poloniex.Poloniex(api_key='key', secret='secret')
+	api.session = FakeSession(blob)
+	# Keep the tests from waiting on the real rate limit
+	api._throttle = poloniex.TokenBucket(10 ** 6, 10 ** 6)
+	return api
+
+
+class PublicMethodsTest(unittest.TestCase):
+	def setUp(self):
+		self.api = make_client()
+
+	def assertSent(self, params):
+		self.assertEqual(self.api.session.calls[-1], ('get', 'https://api.poloniex.com/public', params))
+
+	def test_no_arguments(self):
+		self.api.ticker()
+		self.assertSent({'command': 'returnTicker'})
+		self.api.daily_volume()
+		self.assertSent({'command': 'return24hVolume'})
+		self.api.currencies()
+		self.assertSent({'command': 'returnCurrencies'})
+
+	def test_order_book(self):
+		self.api.order_book()
+		self.assertSent({'command': 'returnOrderBook', 'depth': 10})
+		self.api.order_book('BTC_ETH', depth=5)
+		self.assertSent({'command': 'returnOrderBook', 'currencyPair': 'BTC_ETH', 'depth': 5})
+
+	def test_trade_history(self):
+		self.api.trade_history('BTC_ETH', 1, 2)
+		self.assertSent({'command': 'returnTradeHistory', 'currencyPair': 'BTC_ETH', 'start': 1, 'end': 2})
+
+	def test_chart_data(self):
+		self.api.chart_data('BTC_ETH', start=1, end=2)
+		self.assertSent({
+			'command': 'returnChartData', 'currencyPair': 'BTC_ETH', 'start': 1, 'end': 2,
+			'period': poloniex.CANDLE_PERIOD_14400})
+		self.api.chart_data('BTC_ETH', 1, 2, poloniex.CANDLE_PERIOD_300)
+		self.assertSent({
+			'command': 'returnChartData', 'currencyPair': 'BTC_ETH', 'start': 1, 'end': 2,
+			'period': poloniex.CANDLE_PERIOD_300})
+
+	def test_loan_orders(self):
+		self.api.loan_orders('BTC')
+		self.assertSent({'command': 'returnLoanOrders', 'currency': 'BTC'})
+
+	def test_missing_argument(self):
+		with self.assertRaises(TypeError):
+			self.api.trade_history('BTC_ETH', 1)
+
+	def test_generated_methods_look_hand_written(self):
+		method = poloniex.Poloniex.buy
+		self.assertEqual((method.__module__, method.__qualname__), ('poloniex.poloniex', 'Poloniex.buy'))
+		self.assertEqual(method.__code__.co_filename, '<poloniex buy>')
+		self.assertEqual(poloniex.Poloniex.ticker.__qualname__, 'Poloniex.ticker')
+
+
+class BatchHelpersTest(unittest.TestCase):
+	def test_order_books_all(self):
+		api = make_client({'BTC_ETH': {'seq': 1}, 'BTC_LTC': {'seq': 2}, 'BTC_XMR': {'seq': 3}})
+		self.assertEqual(api.order_books_all(depth=5, pairs=['BTC_ETH', 'BTC_XMR', 'BTC_DOGE']), {
+			'BTC_ETH': {'seq': 1}, 'BTC_XMR': {'seq': 3}})
+		self.assertEqual(
+			api.session.calls[-1],
+			('get', 'https://api.poloniex.com/public', {'command': 'returnOrderBook', 'currencyPair': 'all', 'depth': 5}))
+		self.assertEqual(len(api.order_books_all(depth=5)), 3)
+
+	def test_tickers(self):
+		api = make_client({'BTC_ETH': {'last': '0.03'}, 'BTC_LTC': {'last': '0.01'}})
+		self.assertEqual(api.tickers(['BTC_LTC']), {'BTC_LTC': {'last': '0.01'}})
+		self.assertEqual(api.session.calls[-1], ('get', 'https://api.poloniex.com/public', {'command': 'returnTicker'}))
+
+	def test_errors_are_passed_through(self):
+		error = {'error': 'Please do not make more than 6 API calls per second.'}
+		api = make_client(error)
+		self.assertEqual(api.tickers(['BTC_ETH']), error)
+		self.assertEqual(api.order_books_all(pairs=['BTC_ETH']), error)
+
+
+class FakeStreamedResponse(object):
+	def __init__(self, content):
+		self.raw = io.BytesIO(content)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		pass
+
+
+class FakeStreamingSession(FakeSession):
+	def __init__(self, content):
+		super().__init__()
+		self.content = content
+
+	def get(self, url, params=None, timeout=None, stream=False):
+		self.calls.append(('get', url, dict(params)))
+		return FakeStreamedResponse(self.content)
+
+
+@unittest.skipIf(ijson is None, 'ijson is an optional dependency')
+class ChartDataFieldTest(unittest.TestCase):
+	CANDLES = [
+		{'date': 1405699200, 'high': 0.0045388, 'low': 0.00403001, 'close': 0.00404545, 'volume': 44.5},
+		{'date': 1405713600, 'high': 0.0046, 'low': 0.004, 'close': 0.0045, 'volume': 12},
+	]
+
+	def make_client(self, content):
+		api = make_client()
+		api.session = FakeStreamingSession(content)
+		return api
+
+	def test_matches_chart_data_values_and_types(self):
+		api = self.make_client(orjson.dumps(self.CANDLES))
+		closes = api.chart_data_field('BTC_ETH', 1, 2)
+		self.assertEqual(closes, [candle['close'] for candle in self.CANDLES])
+		self.assertTrue(all(type(value) is float for value in closes))
+		self.assertEqual(api.chart_data_field('BTC_ETH', 1, 2, field='date'), [1405699200, 1405713600])
+		self.assertEqual(api.session.calls[-1][2], {
+			'command': 'returnChartData', 'currencyPair': 'BTC_ETH', 'start': 1, 'end': 2,
+			'period': poloniex.CANDLE_PERIOD_14400})
+
+	def test_error_response_raises(self):
+		api = self.make_client(b'{"error": "Invalid currency pair."}')
+		with self.assertRaisesRegex(Exception, 'Invalid currency pair.'):
+			api.chart_data_field('BTC_XXX', 1, 2)
+
+	def test_empty_interval(self):
+		api = self.make_client(b' []')
+		self.assertEqual(api.chart_data_field('BTC_ETH', 1, 2), [])
+
+
+class CacheTest(unittest.TestCase):
+	@mock.patch('poloniex.poloniex.time.monotonic', return_value=100.0)
+	def test_served_from_cache_until_ttl(self, monotonic):
+		api = make_client({'BTC_ETH': {'last': '0.03'}})
+		first = api.ticker()
+		self.assertIs(api.ticker(), first)
+		self.assertIs(api.tickers(), first)
+		self.assertEqual(len(api.session.calls), 1)
+
+		monotonic.return_value = 100.0 + poloniex.CACHE_TTL_TICKER
+		api.ticker()
+		self.assertEqual(len(api.session.calls), 2)
+
+	@mock.patch('poloniex.poloniex.time.monotonic', return_value=100.0)
+	def test_expired_entries_are_dropped(self, monotonic):
+		api = make_client({'BTC_ETH': {'seq': 1}})
+		api.order_book('BTC_ETH')
+		api.order_book('BTC_LTC')
+		self.assertEqual(len(api._cache), 2)
+
+		monotonic.return_value = 100.0 + poloniex.CACHE_TTL_ORDER_BOOK
+		api.order_book('BTC_ETH')
+		self.assertEqual(list(api._cache), [('order_book', ('BTC_ETH',), ())])
+
+		api.session.blob = {'error': 'Please do not make more than 6 API calls per second.'}
+		monotonic.return_value += poloniex.CACHE_TTL_ORDER_BOOK
+		api.order_book('BTC_ETH')
+		self.assertEqual(api._cache, {})
+
+	def test_docstrings_mention_the_cache(self):
+		self.assertIn('cached for {} seconds'.format(poloniex.CACHE_TTL_TICKER), poloniex.Poloniex.ticker.__doc__)
+		self.assertNotIn('cached', poloniex.Poloniex.trade_history.__doc__)
+
+	def test_arguments_are_part_of_the_key(self):
+		api = make_client()
+		api.order_book('BTC_ETH')
+		api.order_book('BTC_LTC')
+		api.order_book('BTC_ETH')
+		self.assertEqual(len(api.session.calls), 2)
+
+	def test_errors_are_not_cached(self):
+		api = make_client({'error': 'Please do not make more than 6 API calls per second.'})
+		api.currencies()
+		api.currencies()
+		self.assertEqual(len(api.session.calls), 2)
+
+
+@mock.patch('poloniex.poloniex.time.time', return_value=1000.0)
+class PrivateMethodsTest(unittest.TestCase):
+	def setUp(self):
+		self.api = make_client()
+
+	def assertSent(self, params):
+		method, url, body, headers = self.api.session.calls[-1]
+		self.assertEqual((method, url), ('post', 'https://www.poloniex.com/tradingApi'))
+		self.assertEqual(urllib.parse.parse_qsl(body.decode()), [(key, str(value)) for key, value in params])
+		self.assertEqual(headers['Key'], 'key')
+		self.assertEqual(headers['Sign'], hmac.new(b'secret', body, hashlib.sha512).hexdigest())
+
+	def test_no_arguments(self, time):
+		for name, command in [
+			('balances', 'returnBalances'),
+			('complete_balances', 'returnCompleteBalances'),
+			('deposit_addresses', 'returnDepositAddresses'),
+			('fee_info', 'returnFeeInfo'),
+		]:
+			getattr(self.api, name)()
+			self.assertSent([('command', command), ('nonce', self.api._last_nonce)])
+
+	def test_first_nonce_is_the_timestamp(self, time):
+		self.api.balances()
+		self.assertSent([('command', 'returnBalances'), ('nonce', 1000000)])
+
+	def test_currency_and_order_arguments(self, time):
+		self.api.new_deposit_address('BTC')
+		self.assertSent([('command', 'generateNewAddress'), ('currency', 'BTC'), ('nonce', 1000000)])
+		self.api.order_trades(7)
+		self.assertSent([('command', 'returnOrderTrades'), ('orderNumber', 7), ('nonce', 1000001)])
+		self.api.cancel_order(order_id=8)
+		self.assertSent([('command', 'cancelOrder'), ('orderNumber', 8), ('nonce', 1000002)])
+		self.api.available_balances()
+		self.assertSent([('command', 'returnAvailableAccountBalances'), ('account', 'exchange'), ('nonce', 1000003)])
+
+	def test_history_arguments(self, time):
+		self.api.deposits_and_withdrawals(1, 2)
+		self.assertSent([('command', 'returnDepositsWithdrawals'), ('start', 1), ('end', 2), ('nonce', 1000000)])
+		self.api.open_orders()
+		self.assertSent([('command', 'returnOpenOrders'), ('currencyPair', 'all'), ('nonce', 1000001)])
+		self.api.user_trade_history(1, 2, pair='BTC_ETH')
+		self.assertSent([
+			('command', 'returnTradeHistory'), ('start', 1), ('end', 2), ('currencyPair', 'BTC_ETH'), ('nonce', 1000002)])
+
+	def test_orders(self, time):
+		self.api.buy('BTC_ETH', '0.03', '1.5', fill_or_kill=1)
+		self.assertSent([
+			('command', 'buy'), ('currencyPair', 'BTC_ETH'), ('rate', '0.03'), ('amount', '1.5'), ('postOnly', 1),
+			('fillOrKill', 1), ('immediateOrCancel', 0), ('nonce', 1000000)])
+		self.api.sell('BTC_ETH', '0.04', '2', 0, 0, 1)
+		self.assertSent([
+			('command', 'sell'), ('currencyPair', 'BTC_ETH'), ('rate', '0.04'), ('amount', '2'), ('postOnly', 0),
+			('fillOrKill', 0), ('immediateOrCancel', 1), ('nonce', 1000001)])
+
+
+class NonceTest(unittest.TestCase):
+	def test_nonces_strictly_increase_across_threads(self):
+		api = make_client()
+		nonces = []
+
+		def sign():
+			for _ in range(200):
+				body, _ = api._sign_request_data({'command': 'returnBalances'})
+				nonces.append(int(urllib.parse.parse_qs(body.decode())['nonce'][0]))
+
+		threads = [threading.Thread(target=sign) for _ in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(len(set(nonces)), len(nonces))
+		self.assertEqual(max(nonces), api._last_nonce)
+
+
+class TokenBucketTest(unittest.TestCase):
+	@mock.patch('poloniex.poloniex.time.monotonic')
+	def test_waits_once_capacity_is_used(self, monotonic):
+		monotonic.return_value = 100.0
+		bucket = poloniex.TokenBucket(6, 6)
+		for _ in range(6):
+			self.assertEqual(bucket.reserve(), 0)
+		self.assertAlmostEqual(bucket.reserve(), 1 / 6)
+		self.assertAlmostEqual(bucket.reserve(), 2 / 6)
+
+		# A second later six tokens have refilled, paying off the debt of two
+		monotonic.return_value = 101.0
+		self.assertEqual(bucket.reserve(4), 0)
+		self.assertAlmostEqual(bucket.reserve(), 1 / 6)
+
+
+class CredentialsTest(unittest.TestCase):
+	def setUp(self):
+		poloniex.Poloniex._credentials_cache.clear()
+		self.directory = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def write(self, name, content):
+		path = os.path.join(self.directory.name, name)
+		with open(path, 'w') as file:
+			file.write(content)
+		return path
+
+	def test_ini_and_json(self):
+		ini = self.write('config.ini', '[CONFIG]\napiKey=ini key\nsecret=ini secret\n')
+		json = self.write('config.cfg', '  {"apiKey": "json key", "secret": "json secret"}')
+		self.assertEqual(poloniex.Poloniex(ini).api_key, 'ini key')
+		self.assertEqual(poloniex.Poloniex(json).api_key, 'json key')
+
+	def test_sniffed_reader_is_tried_first(self):
+		path = self.write('config.json', '{"apiKey": "json key", "secret": "json secret"}')
+		with mock.patch('poloniex.poloniex._ini_credentials') as ini:
+			poloniex.Poloniex(path)
+		ini.assert_not_called()
+
+	def test_cached_until_modified(self):
+		path = self.write('config.ini', '[CONFIG]\napiKey=first\nsecret=secret\n')
+		poloniex.Poloniex(path)
+		with mock.patch('builtins.open') as opened:
+			self.assertEqual(poloniex.Poloniex(path).api_key, 'first')
+		opened.assert_not_called()
+
+		self.write('config.ini', '[CONFIG]\napiKey=second\nsecret=secret\n')
+		os.utime(path, (0, 0))
+		self.assertEqual(poloniex.Poloniex(path).api_key, 'second')
+
+	def test_python_config_is_rejected(self):
+		with self.assertRaisesRegex(Exception, 'Python config files are no longer supported'):
+			poloniex.Poloniex(self.write('config.py', 'api_key = "key"\nsecret = "secret"\n'))
+
+	def test_misconfigured(self):
+		with self.assertRaisesRegex(Exception, 'not configured correctly'):
+			poloniex.Poloniex(self.write('config.ini', '[OTHER]\napiKey=key\n'))
+		with self.assertRaisesRegex(Exception, 'not configured correctly'):
+			poloniex.Poloniex(os.path.join(self.directory.name, 'missing.ini'))
+
+
+class EqualityTest(unittest.TestCase):
+	def test_same_credentials(self):
+		first = poloniex.Poloniex(api_key='key', secret='secret')
+		second = poloniex.Poloniex(api_key='key', secret='secret')
+		other = poloniex.Poloniex(api_key='key', secret='other')
+
+		self.assertEqual(first, second)
+		self.assertNotEqual(first, other)
+		self.assertNotEqual(first, 'key')
+		self.assertEqual(len({first, second, other}), 2)
+
+	def test_str_hides_secret(self):
+		self.assertNotIn('secret', str(poloniex.Poloniex(api_key='key', secret='secret')))
+
+
+class OrderBookWrapperTest(unittest.TestCase):
+	def setUp(self):
+		self.api = poloniex.Poloniex(api_key='key', secret='secret')
+		self.received = []
+		self.api.attach_order_book(lambda *args, **kwargs: self.received.append(args), 'BTC_ETH')
+		self.handler, self.topic = self.api._subscriptions[0]
+
+	def test_converts_message_fields(self):
+		self.handler(
+			{'type': 'orderBookModify', 'data': {'amount': '1.5', 'rate': '0.03', 'type': 'bid'}},
+			{'type': 'orderBookRemove', 'data': {'rate': '0.04', 'type': 'ask'}},
+			{'type': 'newTrade', 'data': {
+				'tradeID': '42', 'rate': '0.035', 'amount': '2', 'total': '0.07', 'date': '2017-01-02 03:04:05',
+				'type': 'buy'}},
+		)
+
+		self.assertEqual(self.topic, 'BTC_ETH')
+		modifications, removals, trades = self.received[0]
+		self.assertEqual(modifications, [{'amount': decimal.Decimal('1.5'), 'rate': decimal.Decimal('0.03'), 'type': 'bid'}])
+		self.assertEqual(removals, [{'rate': decimal.Decimal('0.04'), 'type': 'ask'}])
+		self.assertEqual(trades, [{
+			'tradeID': '42',
+			'rate': decimal.Decimal('0.035'),
+			'amount': decimal.Decimal('2'),
+			'total': decimal.Decimal('0.07'),
+			'date': datetime.datetime(2017, 1, 2, 3, 4, 5),
+			'type': 'buy',
+		}])
+
+
+class FakeRunner(object):
+	def __init__(self):
+		self.session_classes = []
+
+	def run(self, make):
+		self.session_classes.append(make)
+
+
+class FakeWampSession(object):
+	def __init__(self):
+		self.subscribed = []
+
+	async def subscribe(self, handler, topic):
+		await asyncio.sleep(0)
+		self.subscribed.append(topic)
+
+
+class RunForeverTest(unittest.TestCase):
+	def test_subscribes_every_attached_topic(self):
+		api = poloniex.Poloniex(api_key='key', secret='secret')
+		api.attach_trollbox(print)
+		api.attach_ticker(print)
+		api.attach_order_book(print, 'BTC_ETH')
+		api.runner = FakeRunner()
+		api.run_forever()
+
+		session = FakeWampSession()
+		asyncio.run(api.runner.session_classes[0].onJoin(session, None))
+		self.assertEqual(session.subscribed, ['trollbox', 'ticker', 'BTC_ETH'])
+
+
+class ParseTradeDateTest(unittest.TestCase):
+	def test_matches_strptime(self):
+		value = '2016-12-31 23:59:58'
+		self.assertEqual(
+			poloniex._parse_trade_date(value), datetime.datetime.strptime(value, '%Y-%m-%d %H:%M:%S'))